@@ -4,44 +4,74 @@
 import os
 import uuid
 import base64
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import hashlib
+import asyncio
+import tempfile
+import time
+import threading
+import multiprocessing
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Set, Tuple, Union
 from collections import Counter
+import heapq
+from operator import itemgetter
 import re
 from pathlib import Path
+from functools import lru_cache
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
 
 # FastAPI imports
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Query
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Query, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 # Database imports
-from sqlalchemy import create_engine, Column, String, DateTime, Integer, Text
+from sqlalchemy import create_engine, event, inspect, text, Column, String, DateTime, Integer, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 # PDF processing imports
-import PyPDF2
-from io import BytesIO
+import pymupdf
+from pdf_worker import extract_page_range
 
 # Google AI imports
 from google import genai
 from google.genai import types
 import httpx
 
+# Serialization imports
+import orjson
+
 # Environment and configuration
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 
-# Download NLTK data (run once)
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
+@lru_cache(maxsize=None)
+def get_stopwords() -> frozenset:
+    """English stopwords, loaded once on first use (downloading them if missing)"""
+    # Deployed images download the corpus at build time (see the setup guide's
+    # Dockerfile), so this download only happens in development
+    try:
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        nltk.download('stopwords', quiet=True)
+    try:
+        return frozenset(stopwords.words('english'))
+    except LookupError:
+        # Cached like a success, so a failed download isn't retried on every
+        # fallback; word counts then simply include stopwords
+        print("NLTK stopwords unavailable (run `python -m nltk.downloader stopwords`); "
+              "word frequency will not filter stopwords")
+        return frozenset()
+
+# Words are alphanumeric tokens of 3+ characters that start with a letter; the
+# fallback only counts words, so full Treebank tokenization is unnecessary.
+_WORD_RE = re.compile(r"\b[a-z][a-z0-9]{2,}\b")
 
 # =============================================================================
 # DATABASE SETUP
@@ -49,6 +79,17 @@ except LookupError:
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./documents.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL so readers of /insights aren't blocked by upload commits"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, fewer fsyncs
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256MB
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -58,15 +99,60 @@ class DocumentRecord(Base):
     id = Column(String, primary_key=True, index=True)
     original_filename = Column(String, index=True)
     stored_filename = Column(String)
-    upload_date = Column(DateTime, default=datetime.utcnow)
+    upload_date = Column(DateTime, default=datetime.utcnow, index=True)
     file_size = Column(Integer)
     content_type = Column(String)
-    insights = Column(Text)  # JSON string
-    processing_status = Column(String, default="pending")  # pending, completed, failed
+    insights = Column(Text)  # JSON string, only set on rows stored before the columns below
+    processing_status = Column(String, default="pending")  # pending, processing, completed, failed
     error_message = Column(String, nullable=True)
-
-# Create tables
-Base.metadata.create_all(bind=engine)
+    
+    # Insight fields, stored as columns so listing doesn't parse a JSON blob per row
+    summary = Column(Text, nullable=True)
+    key_skills = Column(Text, nullable=True)  # JSON array
+    experience_level = Column(String, nullable=True)
+    education = Column(Text, nullable=True)
+    highlights = Column(Text, nullable=True)  # JSON array
+    word_frequency = Column(Text, nullable=True)  # JSON object, fallback only
+    processing_method = Column(String, nullable=True)  # ai, fallback
+
+class InsightsCache(Base):
+    __tablename__ = "insights_cache"
+    
+    digest = Column(String, primary_key=True)  # BLAKE2b of the PDF bytes
+    insights = Column(Text)  # JSON string
+    created_date = Column(DateTime, default=datetime.utcnow)
+
+def migrate_database():
+    """Create tables, then add any columns and indexes introduced since"""
+    # Every uvicorn worker runs this at import. BEGIN IMMEDIATE takes SQLite's
+    # write lock before the schema is inspected, so workers migrate one at a
+    # time and later ones find the changes already made.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            # Create tables
+            Base.metadata.create_all(bind=connection)
+            
+            # create_all() skips existing tables, so add columns and indexes introduced since
+            existing_columns = {
+                column["name"] for column in inspect(connection).get_columns(DocumentRecord.__tablename__)
+            }
+            for column in DocumentRecord.__table__.columns:
+                if column.name not in existing_columns:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(
+                        f"ALTER TABLE {DocumentRecord.__tablename__} ADD COLUMN {column.name} {column_type}"
+                    ))
+            
+            for index in DocumentRecord.__table__.indexes:
+                index.create(bind=connection, checkfirst=True)
+            
+            connection.exec_driver_sql("COMMIT")
+        except BaseException:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+
+migrate_database()
 
 def get_db():
     db = SessionLocal()
@@ -87,6 +173,9 @@ class DocumentInsight(BaseModel):
     highlights: List[str] = []
     word_frequency: Optional[Dict[str, int]] = None
     processing_method: str  # "ai" or "fallback"
+    
+    # Not part of the API: False for AI output that couldn't be parsed
+    _cacheable: bool = PrivateAttr(default=True)
 
 class DocumentResponse(BaseModel):
     id: str
@@ -107,12 +196,38 @@ class UploadResponse(BaseModel):
 # FASTAPI APP CONFIGURATION
 # =============================================================================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Recover from interrupted processing on startup and release process-wide resources on shutdown"""
+    recover_interrupted_processing()
+    yield
+    shutdown_pdf_pool()
+
 app = FastAPI(
     title="AI-Powered Document Insight Tool",
     description="Upload PDF documents and receive AI-generated insights and summaries",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+# Allowance for the multipart boundaries and headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized uploads before Starlette spools the multipart body"""
+    # Form parsing buffers the whole body before the endpoint runs, so the size
+    # limit has to be enforced here from the declared Content-Length (the server
+    # never reads more body than it declares)
+    if request.method == "POST" and request.url.path == "/upload-resume":
+        content_length = request.headers.get("content-length")
+        if content_length is None:
+            return JSONResponse(status_code=411, content={"detail": "Content-Length header is required"})
+        if not content_length.isdigit() or int(content_length) > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+            return JSONResponse(status_code=413, content={"detail": "File size too large. Maximum 10MB allowed."})
+    return await call_next(request)
+
 # CORS configuration for React frontend
 origins = [
     "http://localhost:3000",
@@ -153,38 +268,123 @@ gemini_client = setup_gemini_client()
 # PDF PROCESSING UTILITIES
 # =============================================================================
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
-    """Extract text content from PDF bytes"""
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Uploads wait in temp files named with this prefix until processed
+UPLOAD_TEMP_PREFIX = "document-insight-"
+# Background tasks run in the server process and are lost if it exits. Anything
+# still "processing" after this long is treated as interrupted; the threshold
+# is far above the AI timeout so other workers' live documents are left alone
+STALE_PROCESSING_SECONDS = 15 * 60
+
+# Extraction strategy by page count: documents up to SERIAL_EXTRACTION_MAX_PAGES
+# are read serially in-process, where pool overhead would outweigh the work;
+# larger ones are split into page ranges across worker processes. MuPDF is
+# not thread-safe, so there is no thread tier and each worker opens its own
+# copy of the document.
+SERIAL_EXTRACTION_MAX_PAGES = 200
+PAGES_PER_WORKER = 200
+
+# Every uvicorn worker has its own pool, so split the cores between them
+# (uvicorn reads its worker count from WEB_CONCURRENCY). With one uvicorn
+# worker per core, as in the documented production setup, this is 1 and
+# every document is extracted serially; the pool only runs when there are
+# spare cores, e.g. a single uvicorn worker on a multi-core host.
+PDF_POOL_MAX_WORKERS = max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", "1")))
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Return the shared PDF extraction pool, creating it on first use"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # The pool is first used from a worker thread of a multi-threaded
+            # server, so never fork it: children could inherit held locks
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_POOL_MAX_WORKERS,
+                mp_context=multiprocessing.get_context(start_method)
+            )
+        return _pdf_pool
+
+def discard_pdf_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next get_pdf_pool() call starts a fresh one"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        # Another thread may already have replaced it
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_pdf_pool():
+    """Stop the PDF extraction pool's worker processes, if it was started"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(cancel_futures=True)
+            _pdf_pool = None
+
+def extraction_workers(page_count: int) -> int:
+    """Number of worker processes to extract a document with (1 means serial)"""
+    if page_count <= SERIAL_EXTRACTION_MAX_PAGES:
+        return 1
+    return max(1, min(PDF_POOL_MAX_WORKERS, page_count // PAGES_PER_WORKER))
+
+def iter_pages(pdf_path: str) -> Iterator[str]:
+    """Yield the text of each page of a PDF file, in order"""
     try:
-        pdf_file = BytesIO(pdf_bytes)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\\n"
+        with pymupdf.open(pdf_path, filetype="pdf") as doc:
+            page_count = doc.page_count
+            workers = extraction_workers(page_count)
+            if workers == 1:
+                for page in doc:
+                    yield page.get_text("text")
+                return
         
-        return text.strip()
+        next_page = 0
+        for attempt in range(2):
+            chunk_size = -(-(page_count - next_page) // workers)  # ceiling division
+            starts = list(range(next_page, page_count, chunk_size))
+            stops = [min(start + chunk_size, page_count) for start in starts]
+            
+            pool = get_pdf_pool()
+            try:
+                for batch in pool.map(extract_page_range, repeat(pdf_path), starts, stops):
+                    yield from batch
+                    next_page += len(batch)
+                return
+            except BrokenProcessPool:
+                # A worker died (a MuPDF crash, an OOM kill): replace the pool so
+                # later documents aren't affected, and retry the remaining pages once
+                print(f"PDF extraction pool broke on page {next_page} of {pdf_path}, restarting it")
+                discard_pdf_pool(pool)
+                if attempt:
+                    raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to extract text from PDF: {str(e)}")
 
-def get_word_frequency_fallback(text: str, top_n: int = 5) -> Dict[str, int]:
-    """Fallback method: Get top N most frequent words"""
+def get_word_frequency_fallback(pages: Iterable[str], top_n: int = 5) -> Dict[str, int]:
+    """Fallback method: Get top N most frequent words, counting one page at a time"""
     try:
-        # Clean and tokenize text
-        text_lower = text.lower()
-        words = word_tokenize(text_lower)
+        word_freq = Counter()
+        
+        for page_text in pages:
+            # Counter.update() counts a list in C (collections._count_elements),
+            # so there is no per-token Python loop left to compile
+            word_freq.update(_WORD_RE.findall(page_text.lower()))
         
-        # Remove punctuation and stopwords
-        stop_words = set(stopwords.words('english'))
-        filtered_words = [
-            word for word in words 
-            if word.isalnum() and len(word) > 2 and word not in stop_words
-        ]
+        # Remove stopwords once over the vocabulary rather than per token
+        for word in get_stopwords().intersection(word_freq):
+            del word_freq[word]
         
-        # Get word frequency
-        word_freq = Counter(filtered_words)
-        return dict(word_freq.most_common(top_n))
+        # Select the top N without sorting the whole vocabulary
+        return dict(heapq.nlargest(top_n, word_freq.items(), key=itemgetter(1)))
     
+    except HTTPException:
+        # Unreadable PDF: let the caller mark the document as failed
+        raise
     except Exception as e:
         print(f"Error in word frequency analysis: {e}")
         return {}
@@ -193,7 +393,26 @@ def get_word_frequency_fallback(text: str, top_n: int = 5) -> Dict[str, int]:
 # AI PROCESSING FUNCTIONS
 # =============================================================================
 
-def analyze_document_with_gemini(pdf_bytes: bytes, filename: str) -> DocumentInsight:
+# Fenced ```json block in a Gemini response; an unterminated fence runs to the end
+_JSON_FENCE_RE = re.compile(r"```json\s*(.*?)\s*(?:```|\Z)", re.DOTALL)
+
+def extract_json_text(response_text: str) -> str:
+    """Clean a Gemini response to the JSON payload it contains"""
+    match = _JSON_FENCE_RE.search(response_text)
+    return match.group(1) if match else response_text.strip()
+
+def insight_from_ai_response(parsed_response: Dict[str, Any]) -> DocumentInsight:
+    """Build a DocumentInsight from one parsed Gemini JSON object"""
+    return DocumentInsight(
+        summary=parsed_response.get("summary", "No summary available"),
+        key_skills=parsed_response.get("key_skills", []),
+        experience_level=parsed_response.get("experience_level", "Not specified"),
+        education=parsed_response.get("education", "Not specified"),
+        highlights=parsed_response.get("highlights", []),
+        processing_method="ai"
+    )
+
+async def analyze_document_with_gemini(pdf_bytes: bytes, filename: str) -> DocumentInsight:
     """Analyze document using Google Gemini AI"""
     try:
         if not gemini_client:
@@ -217,8 +436,8 @@ Please format your response as a JSON object with these exact keys:
 
 Focus on extracting the most relevant information for recruiters and hiring managers."""
 
-        # Send document to Gemini for analysis
-        response = gemini_client.models.generate_content(
+        # Send document to Gemini for analysis, without blocking the event loop
+        response = await gemini_client.aio.models.generate_content(
             model="gemini-2.0-flash",
             contents=[
                 types.Part.from_bytes(
@@ -232,29 +451,13 @@ Focus on extracting the most relevant information for recruiters and hiring mana
         # Parse the response
         if response and response.text:
             # Try to extract JSON from the response
-            import json
             try:
-                # Clean the response text to extract JSON
-                response_text = response.text.strip()
-                if "```json" in response_text:
-                    json_part = response_text.split("```json")[1].split("```")[0]
-                else:
-                    json_part = response_text
+                parsed_response = orjson.loads(extract_json_text(response.text))
+                return insight_from_ai_response(parsed_response)
                 
-                parsed_response = json.loads(json_part)
-                
-                return DocumentInsight(
-                    summary=parsed_response.get("summary", "No summary available"),
-                    key_skills=parsed_response.get("key_skills", []),
-                    experience_level=parsed_response.get("experience_level", "Not specified"),
-                    education=parsed_response.get("education", "Not specified"),
-                    highlights=parsed_response.get("highlights", []),
-                    processing_method="ai"
-                )
-                
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 # If JSON parsing fails, create a basic insight from the raw response
-                return DocumentInsight(
+                insight = DocumentInsight(
                     summary=response.text[:500] + "..." if len(response.text) > 500 else response.text,
                     key_skills=[],
                     experience_level="Not specified",
@@ -262,6 +465,9 @@ Focus on extracting the most relevant information for recruiters and hiring mana
                     highlights=[],
                     processing_method="ai"
                 )
+                # Don't replay an unparsed response for every re-upload of the file
+                insight._cacheable = False
+                return insight
         
         else:
             raise Exception("No response from Gemini AI")
@@ -270,9 +476,178 @@ Focus on extracting the most relevant information for recruiters and hiring mana
         print(f"Gemini AI analysis failed: {e}")
         raise e
 
-def analyze_document_fallback(text: str) -> DocumentInsight:
+# Uploads arriving within a short window are sent to Gemini together, one
+# request per batch instead of one per document
+GEMINI_BATCH_WINDOW_SECONDS = 0.2
+GEMINI_MAX_BATCH_SIZE = 5
+# Gemini rejects requests with more than ~20MB of inline data
+GEMINI_MAX_BATCH_BYTES = 18 * 1024 * 1024
+# How long an upload waits for its batched result before using the fallback
+GEMINI_RESULT_TIMEOUT_SECONDS = 120
+
+BATCH_ANALYSIS_PROMPT = """The {count} PDF documents above (likely resumes or CVs) belong to different candidates. Analyze each document separately and provide, for each one, a structured summary with the following information:
+
+1. A concise summary of the candidate's background and experience
+2. Key skills mentioned in the document
+3. Experience level (e.g., "2+ years", "Senior level", "Entry level")
+4. Education background
+5. Key highlights or achievements
+
+Please format your response as a JSON array containing exactly {count} objects, one per document in the order the documents were given, each with these exact keys:
+- summary: string
+- key_skills: array of strings
+- experience_level: string
+- education: string
+- highlights: array of strings
+
+Focus on extracting the most relevant information for recruiters and hiring managers."""
+
+# One queue and worker per event loop: a queue bound to another (possibly
+# closed) loop would never be drained. Entries are removed when the worker is
+# cancelled at loop shutdown
+_gemini_batchers: Dict[asyncio.AbstractEventLoop, Tuple[asyncio.Queue, asyncio.Task]] = {}
+_gemini_batch_tasks: Set[asyncio.Task] = set()
+
+async def _analyze_individually(documents: List[Tuple[bytes, str]]) -> List[Union[DocumentInsight, BaseException]]:
+    """Analyze each document with its own Gemini request, capturing per-document errors"""
+    return await asyncio.gather(
+        *(analyze_document_with_gemini(*document) for document in documents),
+        return_exceptions=True
+    )
+
+async def analyze_documents_with_gemini(documents: List[Tuple[bytes, str]]) -> List[Union[DocumentInsight, BaseException]]:
+    """Analyze several documents with a single Gemini request; failures come back as exceptions"""
+    if len(documents) == 1 or not gemini_client:
+        return await _analyze_individually(documents)
+    
+    contents = []
+    for index, (pdf_bytes, filename) in enumerate(documents, start=1):
+        contents.append(f"Document {index}: {filename}")
+        contents.append(types.Part.from_bytes(data=pdf_bytes, mime_type='application/pdf'))
+    contents.append(BATCH_ANALYSIS_PROMPT.format(count=len(documents)))
+    
+    try:
+        response = await gemini_client.aio.models.generate_content(
+            model="gemini-2.0-flash",
+            contents=contents
+        )
+        
+        parsed_response = orjson.loads(extract_json_text(response.text or ""))
+        if not isinstance(parsed_response, list) or len(parsed_response) != len(documents):
+            raise ValueError("batch response does not match the documents sent")
+        return [insight_from_ai_response(item) for item in parsed_response]
+    except Exception as e:
+        # A failed or unusable batch may be down to a single document (or a
+        # transient error), so give every document its own request instead
+        print(f"Gemini batch analysis failed, retrying individually: {e}")
+        return await _analyze_individually(documents)
+
+async def _run_gemini_batch(batch: List[Tuple[bytes, str, asyncio.Future]]):
+    """Send one batch to Gemini and resolve each document's future"""
+    try:
+        results = await analyze_documents_with_gemini(
+            [(pdf_bytes, filename) for pdf_bytes, filename, _ in batch]
+        )
+    except Exception as e:
+        print(f"Gemini AI batch analysis failed: {e}")
+        results = [e] * len(batch)
+    
+    for (_, _, future), result in zip(batch, results):
+        if future.done():
+            continue
+        if isinstance(result, BaseException):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+async def _gemini_batch_worker(queue: asyncio.Queue):
+    """Collect queued documents into batches and dispatch them to Gemini"""
+    loop = asyncio.get_running_loop()
+    # A document that would push a batch over the byte limit starts the next one
+    carried_over = None
+    while True:
+        batch = [carried_over or await queue.get()]
+        carried_over = None
+        batch_bytes = len(batch[0][0])
+        deadline = loop.time() + GEMINI_BATCH_WINDOW_SECONDS
+        while len(batch) < GEMINI_MAX_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if batch_bytes + len(item[0]) > GEMINI_MAX_BATCH_BYTES:
+                carried_over = item
+                break
+            batch.append(item)
+            batch_bytes += len(item[0])
+        
+        # Run the request concurrently so the next batch can start collecting
+        task = loop.create_task(_run_gemini_batch(batch))
+        _gemini_batch_tasks.add(task)
+        task.add_done_callback(_gemini_batch_tasks.discard)
+
+def _forget_gemini_batcher(loop: asyncio.AbstractEventLoop, worker: asyncio.Task):
+    """Drop a loop's batcher once its worker is cancelled by the loop shutting down"""
+    # A worker that died with an error keeps its entry so the queue is reused
+    if worker.cancelled() and _gemini_batchers.get(loop, (None, None))[1] is worker:
+        del _gemini_batchers[loop]
+
+def _get_gemini_queue() -> asyncio.Queue:
+    """Return the running loop's batch queue, (re)starting its worker if needed"""
+    loop = asyncio.get_running_loop()
+    batcher = _gemini_batchers.get(loop)
+    if batcher is not None and not batcher[1].done():
+        return batcher[0]
+    
+    # Keep documents already queued if the previous worker died
+    queue = batcher[0] if batcher is not None else asyncio.Queue()
+    worker = loop.create_task(_gemini_batch_worker(queue))
+    _gemini_batchers[loop] = (queue, worker)
+    worker.add_done_callback(lambda task: _forget_gemini_batcher(loop, task))
+    return queue
+
+async def analyze_document_batched(pdf_bytes: bytes, filename: str) -> DocumentInsight:
+    """Queue a document for batched Gemini analysis and wait for its insights"""
+    future = asyncio.get_running_loop().create_future()
+    await _get_gemini_queue().put((pdf_bytes, filename, future))
+    return await asyncio.wait_for(future, GEMINI_RESULT_TIMEOUT_SECONDS)
+
+def new_pdf_digest():
+    """Content hasher used to key cached AI insights"""
+    return hashlib.blake2b(digest_size=16)
+
+def get_cached_insights(db: Session, digest: str) -> Optional[DocumentInsight]:
+    """Return previously generated AI insights for identical PDF content"""
+    cached = db.query(InsightsCache).filter(InsightsCache.digest == digest).first()
+    if not cached:
+        return None
+    
+    try:
+        return DocumentInsight(**orjson.loads(cached.insights))
+    except Exception as e:
+        print(f"Ignoring unreadable cached insights {digest}: {e}")
+        return None
+
+def cache_insights(digest: str, insights: DocumentInsight):
+    """Best-effort store of AI insights for later uploads of the same file"""
+    try:
+        with SessionLocal() as db:
+            # Another worker may have cached the same file first; keep its entry
+            db.execute(
+                sqlite_insert(InsightsCache)
+                .values(digest=digest, insights=orjson.dumps(insights.dict()).decode())
+                .on_conflict_do_nothing(index_elements=[InsightsCache.digest])
+            )
+            db.commit()
+    except Exception as e:
+        print(f"Failed to cache insights {digest}: {e}")
+
+def analyze_document_fallback(pages: Iterable[str]) -> DocumentInsight:
     """Fallback analysis using word frequency"""
-    word_freq = get_word_frequency_fallback(text, top_n=5)
+    word_freq = get_word_frequency_fallback(pages, top_n=5)
     
     return DocumentInsight(
         summary="AI service temporarily unavailable. Document processed using fallback analysis.",
@@ -300,12 +675,149 @@ async def root():
         }
     }
 
+def store_insights(doc_record: DocumentRecord, insights: DocumentInsight):
+    """Write insights onto a document's columns, JSON-encoding the list fields"""
+    doc_record.summary = insights.summary
+    doc_record.key_skills = orjson.dumps(insights.key_skills).decode()
+    doc_record.experience_level = insights.experience_level
+    doc_record.education = insights.education
+    doc_record.highlights = orjson.dumps(insights.highlights).decode()
+    doc_record.word_frequency = (
+        orjson.dumps(insights.word_frequency).decode() if insights.word_frequency is not None else None
+    )
+    doc_record.processing_method = insights.processing_method
+
+def insights_from_row(row) -> Optional[DocumentInsight]:
+    """Build insights from a document row's columns (or its legacy JSON blob)"""
+    if row.processing_method:
+        return DocumentInsight(
+            summary=row.summary,
+            key_skills=orjson.loads(row.key_skills),
+            experience_level=row.experience_level,
+            education=row.education,
+            highlights=orjson.loads(row.highlights),
+            word_frequency=orjson.loads(row.word_frequency) if row.word_frequency else None,
+            processing_method=row.processing_method
+        )
+    if row.insights:
+        return DocumentInsight(**orjson.loads(row.insights))
+    return None
+
+def _copy_upload_to_temp(src, max_size: int) -> Tuple[str, int, str]:
+    """Copy an upload's spooled file to a temporary file, returning its path, size and digest"""
+    file_size = 0
+    # Hash the chunks already in memory so the file is never re-read to hash it
+    digest = new_pdf_digest()
+    tmp = tempfile.NamedTemporaryFile(prefix=UPLOAD_TEMP_PREFIX, suffix=".pdf", delete=False)
+    try:
+        with tmp:
+            while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > max_size:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="File size too large. Maximum 10MB allowed."
+                    )
+                tmp.write(chunk)
+                digest.update(chunk)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+    
+    return tmp.name, file_size, digest.hexdigest()
+
+async def save_upload_to_temp(file: UploadFile, max_size: int) -> Tuple[str, int, str]:
+    """Stream an upload to a temporary file, returning its path, size and digest"""
+    # Disk reads and writes run off the event loop
+    await file.seek(0)
+    return await asyncio.to_thread(_copy_upload_to_temp, file.file, max_size)
+
+def _mark_document_failed(document_id: str, error_message: str):
+    """Record a processing failure on a document, unless it has been deleted"""
+    with SessionLocal() as db:
+        doc_record = db.query(DocumentRecord).filter(DocumentRecord.id == document_id).first()
+        if not doc_record:
+            # Deleted while processing: there is nothing left to mark as failed
+            return
+        doc_record.processing_status = "failed"
+        doc_record.error_message = error_message
+        db.commit()
+
+def recover_interrupted_processing():
+    """Fail documents and remove temp files left behind by a server that exited mid-processing"""
+    cutoff = datetime.utcnow() - timedelta(seconds=STALE_PROCESSING_SECONDS)
+    with SessionLocal() as db:
+        stale = (
+            db.query(DocumentRecord)
+            .filter(DocumentRecord.processing_status == "processing", DocumentRecord.upload_date < cutoff)
+            .update({
+                DocumentRecord.processing_status: "failed",
+                DocumentRecord.error_message: "Processing was interrupted by a server restart. Please upload the document again."
+            }, synchronize_session=False)
+        )
+        db.commit()
+    if stale:
+        print(f"Marked {stale} interrupted document(s) as failed")
+    
+    cutoff_ts = time.time() - STALE_PROCESSING_SECONDS
+    for path in Path(tempfile.gettempdir()).glob(f"{UPLOAD_TEMP_PREFIX}*.pdf"):
+        try:
+            if path.stat().st_mtime < cutoff_ts:
+                path.unlink()
+        except OSError:
+            pass
+
+async def _process_doc(document_id: str, pdf_path: str, digest: str, filename: str):
+    """Run AI analysis (with fallback) for an uploaded document and store the result"""
+    # Sessions are opened only around database work and closed before any
+    # await, so slow AI calls never hold pooled connections
+    try:
+        with SessionLocal() as db:
+            if db.query(DocumentRecord.id).filter(DocumentRecord.id == document_id).first() is None:
+                # Document was deleted before processing started
+                return
+            
+            # Reuse AI insights from an earlier upload of the same file
+            insights = get_cached_insights(db, digest)
+        cache_hit = insights is not None
+        
+        if not cache_hit:
+            # Try AI analysis first
+            try:
+                pdf_bytes = await asyncio.to_thread(Path(pdf_path).read_bytes)
+                insights = await analyze_document_batched(pdf_bytes, filename)
+            except Exception as ai_error:
+                print(f"AI analysis failed, using fallback: {ai_error}")
+                # Stream page text into the fallback analysis, off the event loop
+                insights = await asyncio.to_thread(analyze_document_fallback, iter_pages(pdf_path))
+        
+        # Only parsed AI results are cached so fallback documents get retried
+        if not cache_hit and insights.processing_method == "ai" and insights._cacheable:
+            cache_insights(digest, insights)
+        
+        with SessionLocal() as db:
+            # The document may have been deleted while it was being analyzed
+            doc_record = db.query(DocumentRecord).filter(DocumentRecord.id == document_id).first()
+            if not doc_record:
+                return
+            
+            # Update database with results
+            store_insights(doc_record, insights)
+            doc_record.processing_status = "completed"
+            db.commit()
+    
+    except Exception as e:
+        _mark_document_failed(document_id, str(e))
+    finally:
+        Path(pdf_path).unlink(missing_ok=True)
+
 @app.post("/upload-resume", response_model=UploadResponse)
 async def upload_resume(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    """Upload and process a PDF resume/document"""
+    """Upload a PDF resume/document and queue it for processing"""
     
     # Validate file type
     if not file.content_type == "application/pdf":
@@ -314,66 +826,41 @@ async def upload_resume(
             detail="Only PDF files are allowed"
         )
     
-    # Validate file size (10MB limit)
-    max_size = 10 * 1024 * 1024  # 10MB
-    file_content = await file.read()
-    if len(file_content) > max_size:
-        raise HTTPException(
-            status_code=400,
-            detail="File size too large. Maximum 10MB allowed."
-        )
-    
-    # Generate unique ID and filename
-    document_id = str(uuid.uuid4())
-    stored_filename = f"{document_id}_{file.filename}"
-    
-    # Create database record
-    doc_record = DocumentRecord(
-        id=document_id,
-        original_filename=file.filename,
-        stored_filename=stored_filename,
-        file_size=len(file_content),
-        content_type=file.content_type,
-        processing_status="processing"
-    )
-    
-    db.add(doc_record)
-    db.commit()
+    # Validate file size (10MB limit) while streaming the upload to disk; the
+    # middleware has already rejected requests that declare a larger body
+    pdf_path, file_size, digest = await save_upload_to_temp(file, MAX_UPLOAD_SIZE)
     
-    # Process the document asynchronously (in a real app, use background tasks)
+    # From here on the temp file is owned by _process_doc, once it is scheduled
     try:
-        # Try AI analysis first
-        try:
-            insights = analyze_document_with_gemini(file_content, file.filename)
-        except Exception as ai_error:
-            print(f"AI analysis failed, using fallback: {ai_error}")
-            # Extract text and use fallback
-            text_content = extract_text_from_pdf(file_content)
-            insights = analyze_document_fallback(text_content)
+        # Generate unique ID and filename
+        document_id = str(uuid.uuid4())
+        stored_filename = f"{document_id}_{file.filename}"
         
-        # Update database with results
-        import json
-        doc_record.insights = json.dumps(insights.dict())
-        doc_record.processing_status = "completed"
-        db.commit()
+        # Create database record
+        doc_record = DocumentRecord(
+            id=document_id,
+            original_filename=file.filename,
+            stored_filename=stored_filename,
+            file_size=file_size,
+            content_type=file.content_type,
+            processing_status="processing"
+        )
         
-    except Exception as e:
-        doc_record.processing_status = "failed"
-        doc_record.error_message = str(e)
+        db.add(doc_record)
         db.commit()
         
-        return UploadResponse(
-            message="Document upload successful, but processing failed",
-            document_id=document_id,
-            filename=file.filename,
-            processing_status="failed"
-        )
+        # Process the document after the response is sent; clients poll /insights
+        # for the final status. For heavier deployments swap this for arq/Celery.
+        background_tasks.add_task(_process_doc, document_id, pdf_path, digest, file.filename)
+    except BaseException:
+        Path(pdf_path).unlink(missing_ok=True)
+        raise
     
     return UploadResponse(
-        message="Document uploaded and processed successfully",
+        message="Document uploaded successfully and queued for processing",
         document_id=document_id,
         filename=file.filename,
-        processing_status="completed"
+        processing_status="processing"
     )
 
 @app.get("/insights", response_model=List[DocumentResponse])
@@ -384,15 +871,33 @@ async def get_insights(
 ):
     """Retrieve document insights"""
     
+    # Select plain rows with only the columns the response needs
+    query = db.query(
+        DocumentRecord.id,
+        DocumentRecord.original_filename,
+        DocumentRecord.upload_date,
+        DocumentRecord.file_size,
+        DocumentRecord.processing_status,
+        DocumentRecord.error_message,
+        DocumentRecord.summary,
+        DocumentRecord.key_skills,
+        DocumentRecord.experience_level,
+        DocumentRecord.education,
+        DocumentRecord.highlights,
+        DocumentRecord.word_frequency,
+        DocumentRecord.processing_method,
+        DocumentRecord.insights
+    )
+    
     if document_id:
         # Get specific document
-        doc_record = db.query(DocumentRecord).filter(DocumentRecord.id == document_id).first()
+        doc_record = query.filter(DocumentRecord.id == document_id).first()
         if not doc_record:
             raise HTTPException(status_code=404, detail="Document not found")
         documents = [doc_record]
     else:
-        # Get all documents (limited)
-        documents = db.query(DocumentRecord).order_by(
+        # Get all documents (limited), newest first via the upload_date index
+        documents = query.order_by(
             DocumentRecord.upload_date.desc()
         ).limit(limit).all()
     
@@ -400,13 +905,10 @@ async def get_insights(
     response_data = []
     for doc in documents:
         insights = None
-        if doc.insights:
-            import json
-            try:
-                insights_data = json.loads(doc.insights)
-                insights = DocumentInsight(**insights_data)
-            except Exception as e:
-                print(f"Failed to parse insights for document {doc.id}: {e}")
+        try:
+            insights = insights_from_row(doc)
+        except Exception as e:
+            print(f"Failed to parse insights for document {doc.id}: {e}")
         
         response_data.append(DocumentResponse(
             id=doc.id,
@@ -467,8 +969,8 @@ Installation Instructions:
    source venv/bin/activate  # On Windows: venv\\Scripts\\activate
 
 2. Install dependencies:
-   pip install fastapi uvicorn python-multipart
-   pip install sqlalchemy PyPDF2 nltk google-genai httpx
+   pip install fastapi "uvicorn[standard]" python-multipart
+   pip install sqlalchemy "pymupdf>=1.24.3" nltk google-genai httpx orjson
 
 3. Set environment variable:
    export GOOGLE_API_KEY="your-google-ai-api-key-here"
@@ -485,9 +987,14 @@ Installation Instructions:
    Interactive docs: http://127.0.0.1:8000/docs
    
 6. For production deployment:
+   - Run one worker per core on uvloop/httptools (included in uvicorn[standard]):
+     export WEB_CONCURRENCY=$(nproc)
+     uvicorn main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --workers $WEB_CONCURRENCY
+     Each worker sizes its PDF extraction pool to cpu_count / WEB_CONCURRENCY,
+     so the workers share the cores instead of each starting cpu_count processes
    - Use a proper database (PostgreSQL, MySQL)
    - Implement proper authentication
-   - Use async background tasks for document processing
+   - Move background processing to a task queue (arq, Celery) backed by Redis
    - Add proper logging and monitoring
    - Configure proper CORS origins
    - Use environment-based configuration
@@ -0,0 +1,13 @@
+# AI-Powered Document Insight Tool - PDF extraction worker
+# Runs inside the backend's extraction process pool. Each worker process
+# imports this module to unpickle its task, so it deliberately imports only
+# PyMuPDF and none of the web app (database, Gemini client, migrations).
+
+from typing import List
+
+import pymupdf
+
+def extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) from a PDF file"""
+    with pymupdf.open(pdf_path, filetype="pdf") as doc:
+        return [doc.load_page(i).get_text("text") for i in range(start, stop)]